@@ -1,7 +1,34 @@
 """
 Library for finding potential genes in a strand of DNA.
 """
-import helpers
+from concurrent.futures import ProcessPoolExecutor
+import functools
+from itertools import chain, product, repeat
+import random
+from types import MappingProxyType
+
+from helpers import amino_acid, load_fasta_file
+
+
+# Translation table used to complement a whole strand at once.
+_COMPLEMENT_TABLE = str.maketrans("ATCGatcg", "TAGCtagc")
+_COMPLEMENTS = {"A": "T", "T": "A", "C": "G", "G": "C"}
+# Amino acid for each of the 64 codons, computed once at import and read-only
+# after that.
+_CODON_AA = MappingProxyType({
+    "".join(codon): amino_acid("".join(codon))
+    for codon in product("ATCG", repeat=3)
+})
+# Amino acid pairs for each of the 4096 six-nucleotide codon pairs, so that
+# long ORFs can be translated two codons per lookup.
+_CODON_PAIR_AA = MappingProxyType({
+    first + second: _CODON_AA[first] + _CODON_AA[second]
+    for first, second in product(_CODON_AA, repeat=2)
+})
+_START_CODON = "ATG"
+_STOP_CODONS = frozenset(
+    codon for codon, acid in _CODON_AA.items() if acid == "*"
+)
 
 
 def get_complement(nucleotide):
@@ -17,15 +44,7 @@ def get_complement(nucleotide):
         A string with a single character character containing
         the complementary nucleotide.
     """
-
-    if nucleotide == "A":
-        return "T"
-    if nucleotide == "T":
-        return "A"
-    if nucleotide == "C":
-        return "G"
-    if nucleotide == "G":
-        return "C"
+    return _COMPLEMENTS[nucleotide]
 
 
 def get_reverse_complement(strand):
@@ -38,16 +57,12 @@ def get_reverse_complement(strand):
         strand: A string repesenting a single strand of DNA.
 
     """
-    # Initialize an empty string
-    complementary_strand = ""
-    # Loop through the strand in reverse order and add the complement
-    # to the empty strand
-    for nucleotide in strand[::-1]:
-        complementary_strand += (get_complement(nucleotide))
-    return complementary_strand
+    # Complement every nucleotide in one pass, then flip the strand. Building
+    # the strand one nucleotide at a time with += is quadratic on long strands.
+    return strand.translate(_COMPLEMENT_TABLE)[::-1]
 
 
-def rest_of_orf(strand):
+def rest_of_orf(strand, start=0):
     """Return the sequence of nucleotides representing the rest of the orf
        not including the stop codon.
 
@@ -57,20 +72,114 @@ def rest_of_orf(strand):
 
     Args:
         strand: A string repesenting a single strand of DNA.
+        start: An integer index in strand where the orf begins. Defaults to
+            the start of the strand.
 
     Returns:
         A string with the sequence of nucleotides that represent the codon not
         including the stop codon. If there is no stop codon in strand, then the
-        strand is returned.
+        rest of the strand is returned.
+    """
+    end = len(strand)
+    # Find the first in-frame occurrence of each stop codon before the
+    # earliest stop found so far, searching the strand in place.
+    for stop_codon in _STOP_CODONS:
+        i = strand.find(stop_codon, start, end + 2)
+        while i != -1 and (i - start) % 3 != 0:
+            i = strand.find(stop_codon, i + 1, end + 2)
+        if i != -1:
+            end = i
+    return strand[start:end]
+
+
+def _codon_positions(strand, codon, reverse=False):
+    """Return the indices of a codon in any reading frame of a strand.
+
+    Args:
+        strand: A string repesenting a single strand of DNA.
+        codon: A string of three nucleotides to search for.
+        reverse: A boolean for whether to search the reverse complement of
+            strand instead. The reverse complement is read from strand itself
+            rather than being built.
+
+    Returns:
+        A sorted list of the indices where codon starts.
+    """
+    if reverse:
+        # the codon starting at index i of the reverse complement is the
+        # reverse complement of the codon starting at index last - i of strand
+        last = len(strand) - 3
+        positions = _codon_positions(strand, get_reverse_complement(codon))
+        return [last - i for i in reversed(positions)]
+    positions = []
+    i = strand.find(codon)
+    while i != -1:
+        positions.append(i)
+        i = strand.find(codon, i + 1)
+    return positions
+
+
+def _scan_orfs(strand, frames=(0, 1, 2), reverse=False):
+    """Return where the non-nested ORFs in reading frames of a strand are.
+
+    The requested frames are scanned in a single pass over the start and stop
+    codons of the strand, keeping track of the ORF open in each frame.
+
+    Args:
+        strand: A string repesenting a single strand of DNA.
+        frames: A tuple of the frame offsets (0, 1 or 2) to scan.
+        reverse: A boolean for whether to scan the reverse complement of
+            strand instead.
+
+    Returns:
+        A tuple of two lists of the same length holding the start and end
+        index of each ORF found in strand, or in its reverse complement if
+        reverse is True.
     """
-    from helpers import amino_acid
-    # Create a list with all the codons which are sequences of
-    # three nucleotides.
-    for i in range(0, len(strand), 3):
-        if amino_acid(strand[i:i + 3]) == "*" and len(strand[i:i + 3]) == 3:
-            return strand[:i]
-    # return the whole strand if no stop codon is found.
-    return strand
+    start_codons = _codon_positions(strand, _START_CODON, reverse)
+    stop_codons = sorted(chain.from_iterable(
+        _codon_positions(strand, codon, reverse) for codon in _STOP_CODONS
+    ))
+    # only walk the codons in the requested frames
+    if len(frames) < 3:
+        start_codons = [i for i in start_codons if i % 3 in frames]
+        stop_codons = [i for i in stop_codons if i % 3 in frames]
+    # the starts and ends of the orfs found in each frame
+    frame_starts = ([], [], [])
+    frame_ends = ([], [], [])
+    # the start of the orf open in each frame, or -1 if there isn't one
+    open_starts = [-1, -1, -1]
+    next_start = 0
+    for stop in stop_codons:
+        # open an orf at the first start codon in each frame before this stop
+        # codon, skipping start codons nested inside an open orf
+        while (next_start < len(start_codons)
+               and start_codons[next_start] < stop):
+            start = start_codons[next_start]
+            if open_starts[start % 3] == -1:
+                open_starts[start % 3] = start
+            next_start += 1
+        # close the orf open in the stop codon's frame
+        frame = stop % 3
+        if open_starts[frame] != -1:
+            frame_starts[frame].append(open_starts[frame])
+            frame_ends[frame].append(stop)
+            open_starts[frame] = -1
+    # open orfs after the last stop codon, which run to the end of the strand
+    for start in start_codons[next_start:]:
+        if open_starts[start % 3] == -1:
+            open_starts[start % 3] = start
+    for frame, start in enumerate(open_starts):
+        if start != -1:
+            frame_starts[frame].append(start)
+            frame_ends[frame].append(len(strand))
+    # list the orfs frame by frame
+    starts = []
+    ends = []
+    for frame in frames:
+        starts.extend(frame_starts[frame])
+        ends.extend(frame_ends[frame])
+    return starts, ends
 
 
 def find_all_orfs_one_frame(strand):
@@ -87,24 +196,8 @@ def find_all_orfs_one_frame(strand):
     Returns:
         A list of strings representing all in-frame ORFs found in the strand.
     """
-    # importing the helper function amino acid
-    from helpers import amino_acid
-    # creating an empty list where orfs will added
-    orfs = []
-    i = 0
-    # looping throught the strand for orfs
-    while i < len(strand):
-        # checking for a start codon in the strand
-        if amino_acid(strand[i:i + 3]) == "M":
-            # adding the orf from the point a start codon is found to the list
-            # and skippping to the point after that orf to avoid adding
-            # nested orfs
-            orfs.append(rest_of_orf(strand[i:]))
-            i = i + len(rest_of_orf(strand[i:]))
-        # if no start codon is found, running the loop from the next codon
-        # which is 3 nucleotides away.
-        i += 3
-    return orfs
+    starts, ends = _scan_orfs(strand, frames=(0,))
+    return [strand[start:end] for start, end in zip(starts, ends)]
 
 
 def find_all_orfs(strand):
@@ -120,14 +213,44 @@ def find_all_orfs(strand):
     Returns:
         A list of strings with all the orfs found in that strand.
     """
-    all_orfs = []
-    # find the orfs with the index shifted by one and two nucleotides.
-    for i in range(3):
-        for elements in find_all_orfs_one_frame(strand[i:]):
-            # don't add the element if it isn't an empty list.
-            if elements != []:
-                all_orfs.append(elements)
-    return all_orfs
+    # find the orfs in all three frames, then slice each one out once.
+    starts, ends = _scan_orfs(strand)
+    return [strand[start:end] for start, end in zip(starts, ends)]
+
+
+def _orf_bounds_both_strands(strand):
+    """Yield where each ORF in a strand and its reverse complement is.
+
+    Args:
+        strand: A string repesenting a single strand of DNA.
+
+    Yields:
+        A tuple of whether the ORF is on the reverse complement, followed by
+        the start and end index of the ORF on that strand.
+    """
+    for reverse in (False, True):
+        starts, ends = _scan_orfs(strand, reverse=reverse)
+        for start, end in zip(starts, ends):
+            yield reverse, start, end
+
+
+def _orf_sequence(strand, reverse, start, end):
+    """Return an ORF found by _orf_bounds_both_strands as a string.
+
+    Args:
+        strand: A string repesenting a single strand of DNA.
+        reverse: A boolean for whether the ORF is on the reverse complement.
+        start: An integer index where the ORF starts.
+        end: An integer index where the ORF ends.
+
+    Returns:
+        A string representing the ORF.
+    """
+    if reverse:
+        # only the part of strand covered by the orf is reverse complemented
+        length = len(strand)
+        return get_reverse_complement(strand[length - end:length - start])
+    return strand[start:end]
 
 
 def find_all_orfs_both_strands(strand):
@@ -137,7 +260,10 @@ def find_all_orfs_both_strands(strand):
     Args:
         strand: A string repesenting a single strand of DNA.
     """
-    return find_all_orfs(strand) + find_all_orfs(get_reverse_complement(strand))
+    return [
+        _orf_sequence(strand, *bounds)
+        for bounds in _orf_bounds_both_strands(strand)
+    ]
 
 
 def find_longest_orf(strand):
@@ -147,18 +273,37 @@ def find_longest_orf(strand):
         strand: A string repesenting a single strand of DNA.
 
     Returns:
-        A string that represents the longest ORF.
+        A string that represents the longest ORF, or an empty string if there
+        are no ORFs.
     """
+    # only the longest orf is sliced out of its strand
+    longest = max(
+        _orf_bounds_both_strands(strand),
+        key=lambda bounds: bounds[2] - bounds[1],
+        default=(False, 0, 0),
+    )
+    return _orf_sequence(strand, *longest)
 
-    return max(find_all_orfs_both_strands(strand), key=len)
 
+def longest_orf_len(strand):
+    """Return the length of the longest ORF in the DNA strand or its reverse
+    complement.
 
-def noncoding_orf_threshold(strand, num_trials):
-    """Return the length of the shortest ORF out of the longest ORFs.
+    Args:
+        strand: A string repesenting a single strand of DNA.
 
-    A single DNA strand is randomly shuffled and the longest ORF from
-    each shuffled version is chosen. Out of all the longest ORFs found,
-     the length of the shortest one is chosen.
+    Returns:
+        An integer that represents the length of the longest ORF, or 0 if
+        there are no ORFs.
+    """
+    return max(
+        (end - start for _, start, end in _orf_bounds_both_strands(strand)),
+        default=0,
+    )
+
+
+def _shortest_longest_orf(strand, num_trials):
+    """Return the length of the shortest longest ORF over shuffled strands.
 
     Args:
         strand: A string repesenting a single strand of DNA.
@@ -168,66 +313,113 @@ def noncoding_orf_threshold(strand, num_trials):
     Returns:
         An integer that represents length of the shortest long ORF
     """
-    import random
-    from helpers import shuffle
     # initializing shortest as the whole strand beacuse the any orf
     # will be shorter than that
-    shortest_long_orf = strand
+    shortest_length = len(strand)
+    # reusing one list of nucleotides, shuffled in place, for every trial
+    nucleotides = list(strand)
     # finds the longest orf for each shuffled version
     for _ in range(num_trials):
-        shuffled_strand = shuffle(strand)
-        long_orf = find_longest_orf(shuffled_strand)
-    # compares the length of the longest orf with the current shortest orf
-        if len(long_orf) < len(shortest_long_orf):
-            shortest_long_orf = long_orf
-    return len(shortest_long_orf)
+        random.shuffle(nucleotides)
+        long_orf_length = longest_orf_len("".join(nucleotides))
+        # compares the length of the longest orf with the current shortest orf
+        shortest_length = min(shortest_length, long_orf_length)
+    return shortest_length
+
+
+@functools.lru_cache(maxsize=8)
+def noncoding_orf_threshold(strand, num_trials, num_workers=1):
+    """Return the length of the shortest ORF out of the longest ORFs.
+
+    A single DNA strand is randomly shuffled and the longest ORF from
+    each shuffled version is chosen. Out of all the longest ORFs found,
+     the length of the shortest one is chosen. Results are cached, so
+     repeated calls with the same strand and number of trials return the
+     same length without shuffling again.
+
+    Args:
+        strand: A string repesenting a single strand of DNA.
+        num_trials: An integer representing the number of times
+        the DNA strand is shuffled.
+        num_workers: An integer representing the number of processes to
+        split the trials between. Defaults to running them all in this
+        process.
+
+    Returns:
+        An integer that represents length of the shortest long ORF
+    """
+    if num_workers <= 1:
+        return _shortest_longest_orf(strand, num_trials)
+    # split the trials as evenly as possible between the workers
+    trials_per_worker = [
+        num_trials // num_workers + (i < num_trials % num_workers)
+        for i in range(num_workers)
+    ]
+    # reseed each worker so they don't all shuffle the strand the same way
+    with ProcessPoolExecutor(num_workers, initializer=random.seed) as executor:
+        return min(executor.map(
+            _shortest_longest_orf, repeat(strand), trials_per_worker
+        ))
 
 
 def encode_amino_acids(orf):
     """Return a string representing the sequence of amino acids
     corresponding to the inputted ORF.
 
+    Codons containing anything other than A, T, C or G (such as N for an
+    unknown nucleotide) are skipped.
+
     Args:
         orf: A string repesenting an orf
     """
-    from helpers import amino_acid
-    # Create a list with all the codons which are sequences of
-    # three nucleotides.
-    codons = []
-    for i in range(0, len(orf), 3):
-        codons.append(orf[i:i + 3])
-    # Create a string of amino acids sequences from the codons if the codons
-    # are 3 characters
-    amino_acid_sequence = ""
-    for codon in codons:
-        if len(codon) == 3:
-            amino_acid_sequence += amino_acid(codon)
-    return amino_acid_sequence
-
-
-def find_genes(path):
+    # Only translate whole codons, ignoring any trailing partial codon.
+    length = len(orf) - len(orf) % 3
+    # Translate codon pairs, then the last codon if there is an odd number.
+    paired_length = length - length % 6
+    try:
+        amino_acids = "".join(
+            _CODON_PAIR_AA[orf[i:i + 6]] for i in range(0, paired_length, 6)
+        )
+    except KeyError:
+        # Fall back to translating one codon at a time, skipping unknown ones.
+        return "".join(
+            _CODON_AA.get(orf[i:i + 3], "") for i in range(0, length, 3)
+        )
+    if paired_length < length:
+        amino_acids += _CODON_AA.get(orf[paired_length:length], "")
+    return amino_acids
+
+
+def find_genes(path, num_trials=1500, num_workers=1):
     """Returns a list of amino acid sequences that represent ORFs that are
     longer than the cutoff length.
 
     Args:
         path: a string path representing the location of a file in FASTA
         format
+        num_trials: an integer representing the number of shuffled strands
+        used to find the cutoff length. Fewer trials run faster but give a
+        less strict cutoff.
+        num_workers: an integer representing the number of processes to
+        split the shuffled strands between. Defaults to running them all in
+        this process.
 
     Returns:
         A list containing all the amino acid sequences for ORFs
         longer than cutoff length
     """
-    from helpers import load_fasta_file
     # creating the strand of DNA
     dna_strand = load_fasta_file(path)
     # finding the cutoff length
-    cutoff_length = noncoding_orf_threshold(dna_strand, 1500)
-    # finding all the orfs
-    all_orfs = find_all_orfs_both_strands(dna_strand)
+    cutoff_length = noncoding_orf_threshold(
+        dna_strand, num_trials, num_workers
+    )
     all_amino_acids = []
     # if the orfs are longer than the cutoff length then find the amino acid
-    # sequence that corresponds to that.
-    for orf in all_orfs:
-        if len(orf) > cutoff_length:
+    # sequence that corresponds to that. Only these orfs are sliced out of
+    # the strand.
+    for reverse, start, end in _orf_bounds_both_strands(dna_strand):
+        if end - start > cutoff_length:
+            orf = _orf_sequence(dna_strand, reverse, start, end)
             all_amino_acids.append(encode_amino_acids(orf))
     return all_amino_acids
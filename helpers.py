@@ -100,13 +100,8 @@ def load_fasta_file(path):
         A string representing the sequence of DNA nucleotides (i.e., the
         characters A, T, C, or G) in the FASTA file.
     """
-    sequence = ""
-    read_header = False
     with open(path, "r") as f:
-        for line in f:
-            if not read_header:
-                # Skip the header line.
-                read_header = True
-                continue
-            sequence += line.strip()
-    return sequence
+        # Skip the header line.
+        next(f, None)
+        # Join the lines once rather than growing the sequence line by line.
+        return "".join(line.strip() for line in f)
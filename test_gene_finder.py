@@ -1,4 +1,6 @@
 from collections import Counter
+import time
+
 import pytest
 
 from gene_finder import (
@@ -9,6 +11,8 @@ from gene_finder import (
     find_all_orfs,
     find_all_orfs_both_strands,
     find_longest_orf,
+    longest_orf_len,
+    noncoding_orf_threshold,
     encode_amino_acids,
 )
 
@@ -92,6 +96,8 @@ coding_strand_to_aa_cases = [
     ("ATGCCCGCTTT", "MPA"),
     # Check a case with only two nucleotides.
     ("AA", ""),
+    # Check that codons with unknown nucleotides are skipped.
+    ("ATGNNNCCCGCN", "MP"),
 ]
 
 
@@ -110,6 +116,59 @@ def test_double_complement(nucleotide):
     assert get_complement(get_complement(nucleotide)) == nucleotide
 
 
+def test_reverse_complement_large_strand():
+    """
+    Check that the reverse complement of a 1 MB strand is correct and takes
+    linear rather than quadratic time to compute.
+    """
+    strand = "ATCG" * 250_000
+    start = time.perf_counter()
+    reverse_complement = get_reverse_complement(strand)
+    elapsed = time.perf_counter() - start
+    assert reverse_complement == "CGAT" * 250_000
+    assert elapsed < 0.05
+
+
+@pytest.mark.parametrize("strand,rest", rest_of_orf_cases)
+def test_rest_of_orf_with_start(strand, rest):
+    """
+    Check that finding the rest of an ORF partway through a strand gives the
+    same result as finding it in the strand sliced from that point.
+
+    Args:
+        strand: A string representing a strand of DNA starting with an ORF.
+        rest: A string representing the expected rest of the ORF.
+    """
+    assert rest_of_orf("CC" + strand, 2) == rest
+
+
+@pytest.mark.parametrize("strand,orf", get_longest_orf_cases + [("AAA", "")])
+def test_longest_orf_len(strand, orf):
+    """
+    Check that the length of the longest ORF matches the longest ORF found.
+
+    Args:
+        strand: A string representing a strand of DNA.
+        orf: A string representing the longest ORF in the strand or its
+            reverse complement.
+    """
+    assert longest_orf_len(strand) == len(orf)
+
+
+@pytest.mark.parametrize("num_trials,num_workers", [(4, 2), (1, 2)])
+def test_noncoding_orf_threshold_workers(num_trials, num_workers):
+    """
+    Check that splitting the shuffle trials between worker processes finds
+    the threshold, even when some workers are given no trials.
+
+    Args:
+        num_trials: An integer representing the number of shuffled strands.
+        num_workers: An integer representing the number of processes used.
+    """
+    # Every shuffle of this strand has no ORFs, so the threshold must be 0.
+    assert noncoding_orf_threshold("A" * 30, num_trials, num_workers) == 0
+
+
 ################################################################################
 # Don't change anything below these lines.
 ################################################################################